@@ -0,0 +1,244 @@
+"""Offline throughput benchmark for the posting pipeline.
+
+Drives process_selected_accounts over synthetic account CSVs with FakeClient, a local
+stand-in for instagrapi.Client, so no request ever reaches Instagram:
+
+    python benchmark.py                                  # 10, 100 and 1000 accounts, 1/4/8 workers
+    python benchmark.py --sizes 5000 --workers 16 --failure-rate 0.05 --json bench.json
+
+Simulated latencies (login, upload proportional to file size) and the rate-limit budgets
+are multiplied by --time-scale so big batches finish in seconds; the report gives both the
+measured numbers and the numbers scaled back to real time.
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from instagrapi.exceptions import ClientForbiddenError, LoginRequired
+import requests
+
+import story_uploader
+
+
+class FakeClient:
+    """Stand-in for instagrapi.Client with simulated latency and injected session failures."""
+    login_latency = 2.0  # seconds for a fresh login
+    validation_latency = 1.0  # seconds for get_timeline_feed
+    upload_latency = 1.5  # fixed seconds per story upload
+    upload_bytes_per_second = 2 * 1024 * 1024
+    failure_rate = 0.0  # chance that an upload fails with login_required or 403
+    time_scale = 0.01
+    rng = random.Random(0)
+    rng_lock = threading.Lock()
+
+    def __init__(self, *args, **kwargs):
+        self.settings = {}
+        self.authorization_data = {}
+        self.delay_range = None
+        self.proxy = None
+        self.private = requests.Session()  # never used for requests, only for adapter mounting
+        self.public = requests.Session()
+
+    @property
+    def user_id(self):
+        return self.authorization_data.get("ds_user_id")
+
+    @property
+    def sessionid(self):
+        return self.authorization_data.get("sessionid")
+
+    def _sleep(self, seconds):
+        time.sleep(seconds * self.time_scale)
+
+    def _chance(self, probability):
+        with self.rng_lock:
+            return self.rng.random() < probability
+
+    def set_settings(self, settings):
+        self.settings = settings
+        self.authorization_data = settings.get("authorization_data", {})
+        return True
+
+    def get_settings(self):
+        return {"authorization_data": self.authorization_data}
+
+    def set_proxy(self, dsn):
+        self.proxy = dsn
+        return bool(dsn)
+
+    def login(self, username, password, **kwargs):
+        self._sleep(self.login_latency)
+        self.authorization_data = {"ds_user_id": str(abs(hash(username)) % 10 ** 9), "sessionid": f"fake-{username}"}
+        return True
+
+    def two_factor_login(self, username, password, verification_code):
+        return self.login(username, password)
+
+    def get_timeline_feed(self):
+        self._sleep(self.validation_latency)
+        return {}
+
+    def _upload(self, path):
+        if self._chance(self.failure_rate):
+            if self._chance(0.5):
+                raise LoginRequired("login_required")
+            raise ClientForbiddenError("403 Client Error: Forbidden")
+        self._sleep(self.upload_latency + os.path.getsize(path) / self.upload_bytes_per_second)
+
+    def photo_upload_to_story(self, path, caption="", links=(), **kwargs):
+        self._upload(path)
+
+    def video_upload_to_story(self, path, caption="", thumbnail=None, links=(), **kwargs):
+        self._upload(path)
+
+
+def make_media(folder, count, seed):
+    """A few shared story images of different sizes, like a real campaign."""
+    from PIL import Image
+    
+    rng = random.Random(seed)
+    paths = []
+    for n in range(count):
+        width, height = rng.choice([(1080, 1920), (1440, 2560), (2000, 3000), (720, 1280)])
+        path = os.path.join(folder, f"story_{n}.jpg")
+        color = tuple(rng.randrange(256) for _ in range(3))
+        Image.new("RGB", (width, height), color).save(path, "JPEG", quality=95)
+        paths.append(path)
+    return paths
+
+
+def make_accounts_csv(path, accounts, media, seed):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=['username', 'password', 'post_file_no_link', 'post_file',
+                                                  'post_caption', 'link_url', 'status'])
+        writer.writeheader()
+        for n in range(accounts):
+            writer.writerow({
+                'username': f"bench_user_{n:05d}",
+                'password': "secret",
+                'post_file_no_link': rng.choice(media),
+                'post_file': rng.choice(media),
+                'post_caption': f"benchmark story {n}",
+                'link_url': "https://example.com/" if n % 2 == 0 else "",
+                'status': "",
+            })
+
+
+def scaled_limits(time_scale):
+    return {scope: (None if rate is None else rate / time_scale, burst)
+            for scope, (rate, burst) in story_uploader.RATE_LIMITS.items()}
+
+
+def max_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_case(accounts, workers, args):
+    """Run one batch in a scratch directory and return its measurements."""
+    workdir = tempfile.mkdtemp(prefix="story_bench_")
+    cwd = os.getcwd()
+    try:
+        os.chdir(workdir)
+        media = make_media(workdir, args.images, args.seed)
+        make_accounts_csv("accounts.csv", accounts, media, args.seed)
+        
+        FakeClient.rng = random.Random(args.seed)
+        metrics = story_uploader.RunMetrics()
+        limiter = story_uploader.RateLimiter(scaled_limits(args.time_scale))
+        media_cache = story_uploader.MediaCache()
+        sessions = story_uploader.SessionStore()
+        
+        tracemalloc.start()
+        start = time.perf_counter()
+        story_uploader.process_selected_accounts(list(range(accounts)), "accounts.csv", max_workers=workers,
+                                                 limiter=limiter, media=media_cache, metrics=metrics,
+                                                 sessions=sessions)
+        wall = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    summary = metrics.summary()
+    account_phase = summary['phases'].get('account', {})
+    counters = summary['counters']
+    return {
+        'accounts': accounts,
+        'workers': workers,
+        'wall_seconds': round(wall, 3),
+        'accounts_per_minute': round(accounts / wall * 60, 1),
+        'simulated_accounts_per_minute': round(accounts / wall * 60 * args.time_scale, 1),
+        'p50_account_seconds': account_phase.get('p50', 0.0),
+        'p95_account_seconds': account_phase.get('p95', 0.0),
+        'peak_traced_mb': round(peak / (1024 * 1024), 1),
+        'max_rss_mb': max_rss_mb(),
+        'stories_posted': counters.get('stories_posted', 0),
+        'stories_failed': counters.get('stories_failed', 0),
+        'relogins': counters.get('relogins', 0),
+        'phases': summary['phases'],
+    }
+
+
+def parse_ints(spec):
+    return [int(part) for part in spec.split(',') if part.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline posting pipeline benchmark")
+    parser.add_argument("--sizes", type=parse_ints, default=[10, 100, 1000], help="account counts, e.g. 10,100,5000")
+    parser.add_argument("--workers", type=parse_ints, default=[1, 4, 8], help="worker counts to compare")
+    parser.add_argument("--time-scale", type=float, default=FakeClient.time_scale,
+                        help="multiplier for simulated latencies and rate-limit intervals")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="chance of login_required/403 per upload")
+    parser.add_argument("--login-latency", type=float, default=FakeClient.login_latency)
+    parser.add_argument("--upload-latency", type=float, default=FakeClient.upload_latency)
+    parser.add_argument("--images", type=int, default=4, help="distinct media files shared by the accounts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write all results to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own log output")
+    args = parser.parse_args(argv)
+    
+    FakeClient.time_scale = args.time_scale
+    FakeClient.failure_rate = args.failure_rate
+    FakeClient.login_latency = args.login_latency
+    FakeClient.upload_latency = args.upload_latency
+    story_uploader.Client = FakeClient
+    story_uploader.configure_logging(console="text" if args.verbose else None)
+    
+    results = []
+    print(f"{'accounts':>8} {'workers':>7} {'wall s':>8} {'acct/min':>9} {'sim acct/min':>12} "
+          f"{'p50 s':>7} {'p95 s':>7} {'peak MB':>8} {'posted':>7} {'failed':>7}")
+    for accounts in args.sizes:
+        for workers in args.workers:
+            result = run_case(accounts, workers, args)
+            results.append(result)
+            print(f"{result['accounts']:>8} {result['workers']:>7} {result['wall_seconds']:>8.2f} "
+                  f"{result['accounts_per_minute']:>9.1f} {result['simulated_accounts_per_minute']:>12.1f} "
+                  f"{result['p50_account_seconds']:>7.3f} {result['p95_account_seconds']:>7.3f} "
+                  f"{result['peak_traced_mb']:>8.1f} {result['stories_posted']:>7} {result['stories_failed']:>7}",
+                  flush=True)
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'time_scale': args.time_scale, 'failure_rate': args.failure_rate, 'results': results},
+                      file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1094 @@
+"""Tkinter GUI for managing accounts and posting stories."""
+import os
+import sys
+import threading
+from collections import deque, defaultdict
+import tkinter as tk
+from tkinter import ttk, scrolledtext, messagebox, simpledialog
+from tkinter import filedialog
+
+from story_uploader import (
+    ACCOUNTS_DB_FILE,
+    AccountStore,
+    ClientPool,
+    PostScheduler,
+    ProxyManager,
+    VaultError,
+    credential_vault,
+    SCHEDULE_WINDOW_MINUTES,
+    classify_status,
+    format_schedule_time,
+    parse_schedule_time,
+    process_selected_accounts,
+    resume_batch,
+    retry_failed,
+    latest_status_report,
+    latest_unfinished_journal,
+)
+
+CONSOLE_MAX_LINES = 5000  # Older console lines are trimmed so a day-long session stays small
+CONSOLE_FLUSH_MS = 100  # How often buffered output is drawn into the console
+TABLE_CHUNK_SIZE = 500  # Table rows inserted or updated per main-loop step, so big lists never freeze the window
+FILTER_DELAY_MS = 250  # Wait this long after the last keystroke in the search box before filtering
+VAULT_UNLOCK_ATTEMPTS = 3  # Passphrase prompts before the GUI runs with the vault locked
+SCHEDULE_CHECK_MS = 1000  # How often 中断から再開 checks whether a scheduled batch is running
+
+# Filter bar choices -> AccountFilterIndex.match() arguments
+ALL_CHOICE = "すべて"
+STATUS_FILTERS = {ALL_CHOICE: None, "成功": "success", "部分成功": "partial", "エラー": "error", "未投稿": "none"}
+LINK_FILTERS = {ALL_CHOICE: None, "リンクあり": True, "リンクなし": False}
+
+# Table column -> account field, for sorting by a column heading
+SORT_FIELDS = {
+    "ユーザー名": 'username',
+    "ストーリー#1(リンクなし)": 'post_file_no_link',
+    "ストーリー#2(リンク付き)": 'post_file',
+    "キャプション": 'post_caption',
+    "リンクURL": 'link_url',
+    "ステータス": 'status',
+}
+
+class TextRedirector:
+    """Redirects stdout/stderr to GUI text widget.
+
+    Any thread may write; text only goes into a bounded ring buffer, and the Tk main
+    loop draws it in one batch every CONSOLE_FLUSH_MS. Writers never touch the widget.
+    """
+    def __init__(self, widget, max_lines=CONSOLE_MAX_LINES, interval=CONSOLE_FLUSH_MS):
+        self.widget = widget
+        self.max_lines = max_lines
+        self.interval = interval
+        self.buffer = deque(maxlen=max_lines)
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.widget.after(self.interval, self.drain)
+
+    def write(self, text):
+        with self.lock:
+            if len(self.buffer) == self.buffer.maxlen:
+                self.dropped += 1
+            self.buffer.append(text)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Insert everything written since the last drain, then trim the oldest lines."""
+        with self.lock:
+            chunks = list(self.buffer)
+            self.buffer.clear()
+            dropped, self.dropped = self.dropped, 0
+        
+        if chunks:
+            if dropped:
+                chunks.insert(0, f"... {dropped} 件のログを省略しました ...\n")
+            self.widget.configure(state='normal')
+            self.widget.insert(tk.END, "".join(chunks))
+            line_count = int(self.widget.index('end-1c').split('.')[0])
+            if line_count > self.max_lines:
+                self.widget.delete('1.0', f"{line_count - self.max_lines + 1}.0")
+            self.widget.see(tk.END)
+            self.widget.configure(state='disabled')
+        
+        self.widget.after(self.interval, self.drain)
+
+
+class AccountFilterIndex:
+    """In-memory indexes over the loaded accounts for the filter bar.
+
+    Status, link and media file lookups are set operations; only the username search
+    looks at each (pre-lowercased) username, and never at the widgets.
+    """
+    def __init__(self, accounts):
+        self.usernames = {}  # username -> lowercase username
+        self.by_status = defaultdict(set)  # 'success' / 'partial' / 'error' / 'none' -> usernames
+        self.with_link = set()
+        self.by_media = defaultdict(set)  # post file path -> usernames
+        for username, row in accounts.items():
+            self.add(username, row)
+
+    @staticmethod
+    def status_key(status):
+        return classify_status(status) if status else "none"
+
+    def add(self, username, row):
+        self.usernames[username] = username.lower()
+        self.by_status[self.status_key(row.get('status', ''))].add(username)
+        if row.get('link_url'):
+            self.with_link.add(username)
+        for column in ('post_file', 'post_file_no_link'):
+            if row.get(column):
+                self.by_media[row[column]].add(username)
+
+    def remove(self, username, row):
+        self.usernames.pop(username, None)
+        self.by_status[self.status_key(row.get('status', ''))].discard(username)
+        self.with_link.discard(username)
+        for column in ('post_file', 'post_file_no_link'):
+            users = self.by_media.get(row.get(column))
+            if users is not None:
+                users.discard(username)
+                if not users:
+                    del self.by_media[row[column]]
+
+    def media_files(self):
+        return sorted(self.by_media)
+
+    def match(self, text="", status=None, has_link=None, media=None):
+        """Set of usernames matching every given criterion."""
+        candidates = set(self.usernames)
+        if status:
+            candidates &= self.by_status.get(status, set())
+        if media:
+            candidates &= self.by_media.get(media, set())
+        if has_link is True:
+            candidates &= self.with_link
+        elif has_link is False:
+            candidates -= self.with_link
+        text = text.strip().lower()
+        if text:
+            candidates = {username for username in candidates if text in self.usernames[username]}
+        return candidates
+
+
+class AccountDialog(tk.Toplevel):
+    """Dialog for adding/editing accounts with separate file fields."""
+    def __init__(self, parent, title="Add Account", account_data=None):
+        super().__init__(parent)
+        self.title(title)
+        self.geometry("550x490")
+        self.resizable(False, False)
+        
+        self.result = None
+        self.account_data = account_data or {}
+        
+        # Center the dialog on parent window
+        self.transient(parent)
+        self.grab_set()
+        
+        # Create widgets first
+        self.create_widgets()
+        
+        # Center the dialog after widgets are created
+        self.update_idletasks()
+        
+        # Get parent window position and size
+        parent_x = parent.winfo_x()
+        parent_y = parent.winfo_y()
+        parent_width = parent.winfo_width()
+        parent_height = parent.winfo_height()
+        
+        # Get dialog size
+        dialog_width = self.winfo_width()
+        dialog_height = self.winfo_height()
+        
+        # Calculate center position
+        x = parent_x + (parent_width - dialog_width) // 2
+        y = parent_y + (parent_height - dialog_height) // 2
+        
+        # Set the position
+        self.geometry(f"+{x}+{y}")
+        
+    def create_widgets(self):
+        # Define fonts
+        label_font = ("Yu Gothic", 10, "bold")
+        entry_font = ("Yu Gothic", 10)
+        button_font = ("Yu Gothic", 10, "bold")
+        
+        # Main frame with padding
+        main_frame = ttk.Frame(self, padding="20")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Username
+        ttk.Label(main_frame, text="ユーザー名:", font=label_font).grid(row=0, column=0, sticky="w", pady=5)
+        self.username_entry = ttk.Entry(main_frame, width=40, font=entry_font)
+        self.username_entry.grid(row=0, column=1, pady=5, padx=(10, 0))
+        self.username_entry.insert(0, self.account_data.get('username', ''))
+        
+        # Password
+        ttk.Label(main_frame, text="パスワード:", font=label_font).grid(row=1, column=0, sticky="w", pady=5)
+        
+        password_frame = ttk.Frame(main_frame)
+        password_frame.grid(row=1, column=1, pady=5, padx=(10, 0))
+        
+        self.password_entry = ttk.Entry(password_frame, width=32, show="*", font=entry_font)
+        self.password_entry.pack(side=tk.LEFT)
+        self.password_entry.insert(0, self.account_data.get('password', ''))
+        
+        # Show/Hide password button
+        self.show_password_var = tk.BooleanVar(value=False)
+        self.show_hide_btn = tk.Button(password_frame, text="👁", command=self.toggle_password,
+                                       font=entry_font, width=3, cursor="hand2")
+        self.show_hide_btn.pack(side=tk.LEFT, padx=(5, 0))
+        
+        # Story #1 File (No Link)
+        ttk.Label(main_frame, text="ストーリー#1（リンクなし）:", font=label_font).grid(row=2, column=0, sticky="w", pady=5)
+        
+        file_frame_1 = ttk.Frame(main_frame)
+        file_frame_1.grid(row=2, column=1, pady=5, padx=(10, 0))
+        
+        self.post_file_no_link_entry = ttk.Entry(file_frame_1, width=26, font=entry_font)
+        self.post_file_no_link_entry.pack(side=tk.LEFT)
+        self.post_file_no_link_entry.insert(0, self.account_data.get('post_file_no_link', ''))
+        
+        # Browse button for Story #1
+        browse_btn_1 = tk.Button(file_frame_1, text="参照…", command=lambda: self.browse_file(1),
+                              font=("Yu Gothic", 9), width=8, cursor="hand2")
+        browse_btn_1.pack(side=tk.LEFT, padx=(5, 0))
+        
+        # Story #2 File (With Link)
+        ttk.Label(main_frame, text="ストーリー#2（リンク付き）:", font=label_font).grid(row=3, column=0, sticky="w", pady=5)
+        
+        file_frame_2 = ttk.Frame(main_frame)
+        file_frame_2.grid(row=3, column=1, pady=5, padx=(10, 0))
+        
+        self.post_file_entry = ttk.Entry(file_frame_2, width=26, font=entry_font)
+        self.post_file_entry.pack(side=tk.LEFT)
+        self.post_file_entry.insert(0, self.account_data.get('post_file', ''))
+        
+        # Browse button for Story #2
+        browse_btn_2 = tk.Button(file_frame_2, text="参照…", command=lambda: self.browse_file(2),
+                              font=("Yu Gothic", 9), width=8, cursor="hand2")
+        browse_btn_2.pack(side=tk.LEFT, padx=(5, 0))
+        
+        # Caption
+        ttk.Label(main_frame, text="キャプション:", font=label_font).grid(row=4, column=0, sticky="nw", pady=5)
+        self.caption_text = tk.Text(main_frame, width=30, height=5, wrap=tk.WORD, font=entry_font)
+        self.caption_text.grid(row=4, column=1, pady=5, padx=(10, 0))
+        self.caption_text.insert("1.0", self.account_data.get('post_caption', ''))
+        
+        # Link URL
+        ttk.Label(main_frame, text="リンクURL:", font=label_font).grid(row=5, column=0, sticky="w", pady=5)
+        self.link_url_entry = ttk.Entry(main_frame, width=40, font=entry_font)
+        self.link_url_entry.grid(row=5, column=1, pady=5, padx=(10, 0))
+        self.link_url_entry.insert(0, self.account_data.get('link_url', ''))
+        
+        # Proxy (empty: shared pool from proxies.txt, or direct)
+        ttk.Label(main_frame, text="プロキシ:", font=label_font).grid(row=6, column=0, sticky="w", pady=5)
+        self.proxy_entry = ttk.Entry(main_frame, width=40, font=entry_font)
+        self.proxy_entry.grid(row=6, column=1, pady=5, padx=(10, 0))
+        self.proxy_entry.insert(0, self.account_data.get('proxy', ''))
+        
+        # Buttons
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=7, column=0, columnspan=2, pady=20)
+        
+        save_btn = tk.Button(button_frame, text="保存", command=self.save, 
+                            font=button_font, width=12, bg="#0095f6", fg="white",
+                            relief="raised", cursor="hand2")
+        save_btn.pack(side=tk.LEFT, padx=5)
+        
+        cancel_btn = tk.Button(button_frame, text="キャンセル", command=self.cancel,
+                              font=button_font, width=12, bg="#f0f0f0",
+                              relief="raised", cursor="hand2")
+        cancel_btn.pack(side=tk.LEFT, padx=5)
+        
+    def save(self):
+        username = self.username_entry.get().strip()
+        password = self.password_entry.get().strip()
+        post_file_no_link = self.post_file_no_link_entry.get().strip()
+        post_file = self.post_file_entry.get().strip()
+        caption = self.caption_text.get("1.0", tk.END).strip()
+        link_url = self.link_url_entry.get().strip()
+        proxy = self.proxy_entry.get().strip()
+        
+        if not username:
+            messagebox.showwarning("入力エラー", "ユーザー名は必須です！")
+            return
+        
+        if not password:
+            messagebox.showwarning("入力エラー", "パスワードは必須です！")
+            return
+            
+        self.result = {
+            'username': username,
+            'password': password,
+            'post_file_no_link': post_file_no_link,
+            'post_file': post_file,
+            'post_caption': caption,
+            'link_url': link_url,
+            'proxy': proxy
+        }
+        self.destroy()
+        
+    def cancel(self):
+        self.destroy()
+    
+    def toggle_password(self):
+        """Toggle password visibility."""
+        if self.show_password_var.get():
+            # Hide password
+            self.password_entry.config(show="*")
+            self.show_hide_btn.config(text="👁")
+            self.show_password_var.set(False)
+        else:
+            # Show password
+            self.password_entry.config(show="")
+            self.show_hide_btn.config(text="👁‍🗨")
+            self.show_password_var.set(True)
+    
+    def browse_file(self, story_num):
+        """Open file browser to select a post file."""
+        # Define file types for images and videos
+        filetypes = (
+            ('All Media Files', '*.jpg *.jpeg *.png *.gif *.mp4 *.mov *.avi *.mkv'),
+            ('Image Files', '*.jpg *.jpeg *.png *.gif'),
+            ('Video Files', '*.mp4 *.mov *.avi *.mkv'),
+            ('All Files', '*.*')
+        )
+        
+        filename = filedialog.askopenfilename(
+            title=f'ストーリー#{story_num}',
+            filetypes=filetypes,
+            parent=self
+        )
+        
+        if filename:
+            if story_num == 1:
+                self.post_file_no_link_entry.delete(0, tk.END)
+                self.post_file_no_link_entry.insert(0, filename)
+            else:
+                self.post_file_entry.delete(0, tk.END)
+                self.post_file_entry.insert(0, filename)
+
+
+class ScheduleDialog(tk.Toplevel):
+    """Lists the posting schedules and adds or deletes them."""
+    def __init__(self, parent, scheduler, source, checked_usernames):
+        super().__init__(parent)
+        self.title("スケジュール投稿")
+        self.geometry("700x450")
+        
+        self.scheduler = scheduler
+        self.source = source
+        self.checked_usernames = checked_usernames
+        
+        self.transient(parent)
+        self.grab_set()
+        
+        self.create_widgets()
+        self.refresh()
+    
+    def create_widgets(self):
+        label_font = ("Yu Gothic", 10, "bold")
+        entry_font = ("Yu Gothic", 10)
+        button_font = ("Yu Gothic", 10, "bold")
+        
+        main_frame = ttk.Frame(self, padding="20")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Existing schedules
+        columns = ("ID", "次回 (JST)", "繰り返し", "時間幅", "対象")
+        self.tree = ttk.Treeview(main_frame, columns=columns, show="headings", height=8)
+        for column, width in zip(columns, (40, 170, 80, 80, 250)):
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=width)
+        self.tree.grid(row=0, column=0, columnspan=4, sticky="nsew", pady=(0, 15))
+        main_frame.grid_rowconfigure(0, weight=1)
+        
+        # New schedule
+        ttk.Label(main_frame, text="時刻 (JST):", font=label_font).grid(row=1, column=0, sticky="w", pady=5)
+        self.time_entry = ttk.Entry(main_frame, width=20, font=entry_font)
+        self.time_entry.grid(row=1, column=1, sticky="w", pady=5)
+        self.time_entry.insert(0, "09:00")
+        ttk.Label(main_frame, text='"HH:MM" または "YYYY-MM-DD HH:MM"').grid(row=1, column=2, columnspan=2, sticky="w")
+        
+        self.daily_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(main_frame, text="毎日繰り返す", variable=self.daily_var).grid(row=2, column=1, sticky="w", pady=5)
+        
+        ttk.Label(main_frame, text="時間幅（分）:", font=label_font).grid(row=3, column=0, sticky="w", pady=5)
+        self.window_entry = ttk.Entry(main_frame, width=8, font=entry_font)
+        self.window_entry.grid(row=3, column=1, sticky="w", pady=5)
+        self.window_entry.insert(0, str(SCHEDULE_WINDOW_MINUTES))
+        
+        ttk.Label(main_frame, text="対象:", font=label_font).grid(row=4, column=0, sticky="w", pady=5)
+        self.target_var = tk.StringVar(value="checked" if self.checked_usernames else "all")
+        ttk.Radiobutton(main_frame, text=f"チェックしたアカウント（{len(self.checked_usernames)} 件）",
+                        variable=self.target_var, value="checked").grid(row=4, column=1, columnspan=2, sticky="w")
+        ttk.Radiobutton(main_frame, text="全アカウント（実行時点）", variable=self.target_var,
+                        value="all").grid(row=5, column=1, columnspan=2, sticky="w")
+        
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=6, column=0, columnspan=4, pady=15)
+        
+        tk.Button(button_frame, text="追加", command=self.add, font=button_font, width=12, bg="#0095f6", fg="white",
+                  relief="raised", cursor="hand2").pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="削除", command=self.delete, font=button_font, width=12, bg="#dc3545",
+                  fg="white", relief="raised", cursor="hand2").pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="閉じる", command=self.destroy, font=button_font, width=12, bg="#f0f0f0",
+                  relief="raised", cursor="hand2").pack(side=tk.LEFT, padx=5)
+    
+    def refresh(self):
+        self.tree.delete(*self.tree.get_children())
+        for schedule in self.scheduler.schedules():
+            target = f"{len(schedule['usernames'])} 件" if schedule['usernames'] else "全アカウント"
+            repeat = "毎日" if schedule['repeat'] == "daily" else "1回"
+            self.tree.insert("", tk.END, iid=str(schedule['id']),
+                             values=(schedule['id'], format_schedule_time(schedule['next_run']), repeat,
+                                     f"{schedule['window_minutes']} 分", target))
+    
+    def add(self):
+        try:
+            when = parse_schedule_time(self.time_entry.get())
+            window = int(self.window_entry.get())
+        except ValueError:
+            messagebox.showwarning("入力エラー", "時刻または時間幅が正しくありません。", parent=self)
+            return
+        
+        usernames = None
+        if self.target_var.get() == "checked":
+            if not self.checked_usernames:
+                messagebox.showwarning("未選択", "アカウントがチェックされていません。", parent=self)
+                return
+            usernames = self.checked_usernames
+        
+        self.scheduler.add(self.source, when, "daily" if self.daily_var.get() else "once", usernames, window)
+        self.refresh()
+    
+    def delete(self):
+        for item in self.tree.selection():
+            self.scheduler.remove(int(item))
+        self.refresh()
+
+
+class InstagramGUI:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("インスタグラムストーリー投稿ツール - デュアルモード")
+        self.root.geometry("1400x700")
+        
+        # Data
+        self.accounts = {}  # username -> row, in store order; Treeview item ids are usernames
+        self.account_index = {}  # username -> row index passed to process_selected_accounts
+        self.table_generation = 0  # Bumped on every reload so stale chunked updates stop
+        self.filter_index = AccountFilterIndex({})
+        self.sort_column = None
+        self.sort_reverse = False
+        self.filter_job = None
+        self.csv_file = "accounts.csv"
+        self.store = AccountStore(ACCOUNTS_DB_FILE)
+        self.vault = credential_vault  # Passwords live here once unlocked, not in the store
+        self.client_pool = ClientPool()  # Logged-in clients reused across batches
+        self.proxies = ProxyManager.from_file()  # Proxy health and assignments carry over between batches
+        self.scheduler = PostScheduler(run_batch=self.run_scheduled_batch)
+        self.posting = False  # A batch started from the buttons is running
+        
+        # Create UI
+        self.create_widgets()
+        self.unlock_vault()
+        self.load_accounts()
+        
+        # Scheduled batches run while the window is open
+        self.scheduler.start()
+        self.watch_scheduled_batches()
+        
+    def create_widgets(self):
+        # Top frame for buttons with border
+        top_frame = ttk.LabelFrame(self.root, text="", padding="15", relief="solid", borderwidth=2)
+        top_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        # Title and buttons in the same row
+        title_label = ttk.Label(top_frame, text="インスタグラムストーリー投稿ツール", font=("Arial", 18, "bold"))
+        title_label.pack(side=tk.LEFT, padx=(0, 30))
+        
+        # Buttons
+        button_frame = ttk.Frame(top_frame)
+        button_frame.pack(side=tk.RIGHT)
+        
+        self.add_btn = tk.Button(button_frame, text="アカウント追加", command=self.add_account,
+                                 font=("Arial", 10, "bold"), width=12, height=1, bg="#28a745", fg="white",
+                                 relief="raised", cursor="hand2")
+        self.add_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.edit_btn = tk.Button(button_frame, text="アカウント編集", command=self.edit_account,
+                                  font=("Arial", 10, "bold"), width=12, height=1, bg="#ffc107",
+                                  relief="raised", cursor="hand2")
+        self.edit_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.delete_btn = tk.Button(button_frame, text="アカウント削除", command=self.delete_account,
+                                    font=("Arial", 10, "bold"), width=12, height=1, bg="#dc3545", fg="white",
+                                    relief="raised", cursor="hand2")
+        self.delete_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.select_all_btn = tk.Button(button_frame, text="全選択", command=self.select_all, 
+                                         font=("Arial", 10, "bold"), width=12, height=1, bg="#f0f0f0", 
+                                         relief="raised", cursor="hand2")
+        self.select_all_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.deselect_all_btn = tk.Button(button_frame, text="全解除", command=self.deselect_all,
+                                           font=("Arial", 10, "bold"), width=12, height=1, bg="#f0f0f0",
+                                           relief="raised", cursor="hand2")
+        self.deselect_all_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.refresh_btn = tk.Button(button_frame, text="更新", command=self.load_accounts,
+                                      font=("Arial", 10, "bold"), width=12, height=1, bg="#f0f0f0",
+                                      relief="raised", cursor="hand2")
+        self.refresh_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.import_btn = tk.Button(button_frame, text="CSV取込", command=self.import_csv,
+                                     font=("Arial", 10, "bold"), width=12, height=1, bg="#f0f0f0",
+                                     relief="raised", cursor="hand2")
+        self.import_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.export_btn = tk.Button(button_frame, text="CSV書出", command=self.export_csv,
+                                     font=("Arial", 10, "bold"), width=12, height=1, bg="#f0f0f0",
+                                     relief="raised", cursor="hand2")
+        self.export_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.post_btn = tk.Button(button_frame, text="ストーリー投稿", command=self.post_stories,
+                                   font=("Arial", 10, "bold"), width=12, height=1, bg="#0095f6", fg="white",
+                                   relief="raised", cursor="hand2", activebackground="#0081d9")
+        self.post_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.resume_btn = tk.Button(button_frame, text="中断から再開", command=self.resume_posting,
+                                     font=("Arial", 10, "bold"), width=12, height=1, bg="#f0f0f0",
+                                     relief="raised", cursor="hand2")
+        self.resume_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.retry_btn = tk.Button(button_frame, text="失敗のみ再試行", command=self.retry_failed_posts,
+                                    font=("Arial", 10, "bold"), width=12, height=1, bg="#f0f0f0",
+                                    relief="raised", cursor="hand2")
+        self.retry_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.schedule_btn = tk.Button(button_frame, text="スケジュール", command=self.open_schedules,
+                                       font=("Arial", 10, "bold"), width=12, height=1, bg="#f0f0f0",
+                                       relief="raised", cursor="hand2")
+        self.schedule_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Filter bar
+        filter_frame = ttk.Frame(self.root)
+        filter_frame.pack(fill=tk.X, padx=10)
+        
+        ttk.Label(filter_frame, text="ユーザー名:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", self.schedule_filter)
+        ttk.Entry(filter_frame, textvariable=self.search_var, width=20).pack(side=tk.LEFT, padx=(5, 15))
+        
+        ttk.Label(filter_frame, text="前回の結果:").pack(side=tk.LEFT)
+        self.status_filter = ttk.Combobox(filter_frame, values=list(STATUS_FILTERS), state="readonly", width=10)
+        self.status_filter.set(ALL_CHOICE)
+        self.status_filter.pack(side=tk.LEFT, padx=(5, 15))
+        
+        ttk.Label(filter_frame, text="リンク:").pack(side=tk.LEFT)
+        self.link_filter = ttk.Combobox(filter_frame, values=list(LINK_FILTERS), state="readonly", width=10)
+        self.link_filter.set(ALL_CHOICE)
+        self.link_filter.pack(side=tk.LEFT, padx=(5, 15))
+        
+        ttk.Label(filter_frame, text="メディア:").pack(side=tk.LEFT)
+        self.media_filter = ttk.Combobox(filter_frame, values=[ALL_CHOICE], state="readonly", width=40)
+        self.media_filter.set(ALL_CHOICE)
+        self.media_filter.pack(side=tk.LEFT, padx=(5, 15))
+        
+        for combobox in (self.status_filter, self.link_filter, self.media_filter):
+            combobox.bind("<<ComboboxSelected>>", self.apply_filter)
+        
+        self.select_matching_btn = tk.Button(filter_frame, text="該当を全選択", command=self.select_matching,
+                                              font=("Arial", 10, "bold"), width=12, bg="#f0f0f0",
+                                              relief="raised", cursor="hand2")
+        self.select_matching_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.clear_filter_btn = tk.Button(filter_frame, text="絞り込み解除", command=self.clear_filter,
+                                           font=("Arial", 10, "bold"), width=12, bg="#f0f0f0",
+                                           relief="raised", cursor="hand2")
+        self.clear_filter_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.filter_count_label = ttk.Label(filter_frame, text="")
+        self.filter_count_label.pack(side=tk.LEFT, padx=10)
+        
+        # Main container - split into two parts
+        main_container = ttk.PanedWindow(self.root, orient=tk.VERTICAL)
+        main_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        # Top part - Table
+        table_frame = ttk.Frame(main_container)
+        main_container.add(table_frame, weight=1)
+        
+       # Create Treeview for table with Japanese columns
+        columns = ("選択", "ユーザー名", "ストーリー#1(リンクなし)", "ストーリー#2(リンク付き)", "キャプション", "リンクURL", "ステータス")
+        self.tree = ttk.Treeview(table_frame, columns=columns, show="headings", selectmode="extended")
+
+        # Configure columns (displayed headers in Japanese)
+        self.tree.heading("選択", text="☑")
+        self.tree.heading("ユーザー名", text="ユーザー名")
+        self.tree.heading("ストーリー#1(リンクなし)", text="ストーリー#1(リンクなし)")
+        self.tree.heading("ストーリー#2(リンク付き)", text="ストーリー#2(リンク付き)")
+        self.tree.heading("キャプション", text="キャプション")
+        self.tree.heading("リンクURL", text="リンクURL")
+        self.tree.heading("ステータス", text="ステータス")
+        
+        # Click a heading to sort by that column, again to reverse
+        for column in SORT_FIELDS:
+            self.tree.heading(column, command=lambda column=column: self.sort_by(column))
+
+        # Set column widths and alignment
+        self.tree.column("選択", width=50, anchor="center")
+        self.tree.column("ユーザー名", width=150)
+        self.tree.column("ストーリー#1(リンクなし)", width=250)
+        self.tree.column("ストーリー#2(リンク付き)", width=250)
+        self.tree.column("キャプション", width=250)
+        self.tree.column("リンクURL", width=200)
+        self.tree.column("ステータス", width=200)
+        
+        # Scrollbars for table
+        vsb = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        hsb = ttk.Scrollbar(table_frame, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+        
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        vsb.grid(row=0, column=1, sticky="ns")
+        hsb.grid(row=1, column=0, sticky="ew")
+        
+        table_frame.grid_rowconfigure(0, weight=1)
+        table_frame.grid_columnconfigure(0, weight=1)
+        
+        # Bind click event for checkbox toggle
+        self.tree.bind("<Button-1>", self.on_tree_click)
+        
+        # Bottom part - Console/Log window
+        console_frame = ttk.LabelFrame(main_container, text="コンソール出力", padding="5")
+        main_container.add(console_frame, weight=1)
+        
+        self.console = scrolledtext.ScrolledText(console_frame, wrap=tk.WORD, bg="black", fg="white", font=("Consolas", 9))
+        self.console.pack(fill=tk.BOTH, expand=True)
+        self.console.configure(state='disabled')
+        
+        # Redirect stdout to console
+        sys.stdout = TextRedirector(self.console)
+        
+        # Selected items tracking
+        self.selected_items = set()
+        
+    def unlock_vault(self):
+        """Ask for the vault passphrase once per run (or set one on first start).
+
+        If the user cancels, the vault stays locked and passwords are kept in the store as before.
+        """
+        creating = not self.vault.exists()
+        for _ in range(VAULT_UNLOCK_ATTEMPTS):
+            if creating:
+                passphrase = simpledialog.askstring("パスワード保管庫", "パスワードを暗号化して保存します。\n"
+                                                    "保管庫のパスフレーズを設定してください：", show="*",
+                                                    parent=self.root)
+                if passphrase and simpledialog.askstring("パスワード保管庫", "確認のため、もう一度入力してください：",
+                                                         show="*", parent=self.root) != passphrase:
+                    messagebox.showwarning("パスワード保管庫", "パスフレーズが一致しません。")
+                    continue
+            else:
+                passphrase = simpledialog.askstring("パスワード保管庫", "保管庫のパスフレーズを入力してください：",
+                                                    show="*", parent=self.root)
+            if passphrase is None:
+                break
+            try:
+                self.vault.unlock(passphrase)
+                return
+            except VaultError as e:
+                messagebox.showwarning("パスワード保管庫", f"保管庫を開けませんでした: {e}")
+        print("  パスワード保管庫はロックされたままです（パスワードはアカウントデータに保存されます）")
+    
+    def store_password(self, row, old_username=None):
+        """Put a dialog result's password into the vault and blank it in the row, if the vault is unlocked."""
+        if self.vault.unlocked:
+            self.vault.set(row['username'], row['password'], old_username=old_username)
+            row['password'] = ''
+    
+    def load_accounts(self):
+        """Load all accounts from the account store and rebuild the table.
+
+        The account data is ready at once; table rows are inserted TABLE_CHUNK_SIZE at a
+        time from the main loop.
+        """
+        self.selected_items.clear()
+        
+        # First start with a store: take over the existing accounts.csv, once. Later an empty
+        # store means the user deleted every account, not that the CSV is still to be read.
+        if self.store.get_meta('csv_migrated') is None:
+            if not len(self.store) and os.path.exists(self.csv_file):
+                count = self.store.import_csv(self.csv_file)
+                print(f"  {count} 件のアカウントを {self.csv_file} から {self.store.filename} に取り込みました")
+            self.store.set_meta('csv_migrated', self.csv_file)
+        
+        # Passwords from older stores and CSV imports go into the vault
+        if self.vault.unlocked:
+            moved = self.store.move_passwords(self.vault)
+            if moved:
+                print(f"  {moved} 件のパスワードを暗号化して {self.vault.filename} に移しました")
+        
+        self.accounts = {row['username']: row for row in self.store.all()}
+        self.reindex_accounts()
+        self.filter_index = AccountFilterIndex(self.accounts)
+        self.update_media_choices()
+        self.apply_filter()
+        
+        print(f"  {len(self.accounts)} 件のアカウントを {self.store.filename} から読み込みました")
+    
+    def update_media_choices(self):
+        self.media_filter['values'] = [ALL_CHOICE] + self.filter_index.media_files()
+        if self.media_filter.get() not in self.filter_index.by_media:
+            self.media_filter.set(ALL_CHOICE)
+    
+    def matching_accounts(self):
+        """Usernames matching the filter bar."""
+        media = self.media_filter.get()
+        return self.filter_index.match(self.search_var.get(), STATUS_FILTERS[self.status_filter.get()],
+                                       LINK_FILTERS[self.link_filter.get()], None if media == ALL_CHOICE else media)
+    
+    def schedule_filter(self, *args):
+        """Filter shortly after typing stops instead of on every keystroke."""
+        if self.filter_job is not None:
+            self.root.after_cancel(self.filter_job)
+        self.filter_job = self.root.after(FILTER_DELAY_MS, self.apply_filter)
+    
+    def apply_filter(self, *args):
+        """Rebuild the table with the accounts matching the filter bar, in the chosen sort order."""
+        self.filter_job = None
+        self.table_generation += 1
+        self.tree.delete(*self.tree.get_children())
+        
+        matches = self.matching_accounts()
+        visible = [username for username in self.accounts if username in matches]
+        if self.sort_column:
+            field = SORT_FIELDS[self.sort_column]
+            visible.sort(key=lambda username: self.accounts[username].get(field, '').lower(), reverse=self.sort_reverse)
+        self.in_chunks(visible, self.insert_row)
+        self.update_filter_count(len(visible))
+    
+    def update_filter_count(self, visible=None):
+        """Show how many accounts are listed, and how many checked ones the filter hides."""
+        matches = self.matching_accounts()
+        if visible is None:
+            visible = len(matches)
+        text = f"{visible} / {len(self.accounts)} 件を表示"
+        hidden = len(self.selected_items - matches)
+        if hidden:
+            text += f"（非表示の選択 {hidden} 件）"
+        self.filter_count_label.configure(text=text)
+    
+    def sort_by(self, column):
+        self.sort_reverse = not self.sort_reverse if self.sort_column == column else False
+        self.sort_column = column
+        self.apply_filter()
+    
+    def clear_filter(self):
+        self.search_var.set("")
+        for combobox in (self.status_filter, self.link_filter, self.media_filter):
+            combobox.set(ALL_CHOICE)
+        self.apply_filter()
+    
+    def select_matching(self):
+        """Check every account that matches the filter bar."""
+        matches = self.matching_accounts()
+        self.selected_items |= matches
+        self.in_chunks(self.tree.get_children(), self.show_checked)
+        self.update_filter_count()
+        print(f"  条件に一致する {len(matches)} 件のアカウントを選択しました（選択中 {len(self.selected_items)} 件）")
+    
+    def reindex_accounts(self):
+        self.account_index = {username: i for i, username in enumerate(self.accounts)}
+    
+    def in_chunks(self, items, action):
+        """Call ``action(item)`` for every item, TABLE_CHUNK_SIZE per main-loop step.
+
+        Stops when the table is reloaded in between.
+        """
+        generation = self.table_generation
+        
+        def step(start):
+            if generation != self.table_generation:
+                return
+            for item in items[start:start + TABLE_CHUNK_SIZE]:
+                action(item)
+            if start + TABLE_CHUNK_SIZE < len(items):
+                self.root.after(1, step, start + TABLE_CHUNK_SIZE)
+        
+        step(0)
+    
+    def insert_row(self, username):
+        """Add one account to the table unless it was deleted or inserted meanwhile."""
+        if username in self.accounts and not self.tree.exists(username):
+            self.tree.insert("", tk.END, iid=username,
+                             values=self.row_values(self.accounts[username], username in self.selected_items))
+    
+    def show_checked(self, username):
+        """Draw the checkbox of one row from selected_items, if the row is already in the table."""
+        if self.tree.exists(username):
+            self.tree.set(username, "選択", "☑" if username in self.selected_items else "☐")
+    
+    @staticmethod
+    def row_values(row, checked=False):
+        """Treeview values of one account."""
+        caption = row.get('post_caption', '')
+        # Truncate caption for display
+        display_caption = caption[:40] + "..." if len(caption) > 40 else caption
+        return ("☑" if checked else "☐", row['username'], row.get('post_file_no_link', ''), row.get('post_file', ''),
+                display_caption, row.get('link_url', ''), row.get('status', ''))
+    
+    def import_csv(self):
+        """Add or update accounts from a CSV file."""
+        filename = filedialog.askopenfilename(title="CSV取込", parent=self.root,
+                                              filetypes=(('CSV Files', '*.csv'), ('All Files', '*.*')))
+        if not filename:
+            return
+        count = self.store.import_csv(filename)
+        print(f"  {count} 件のアカウントを {filename} から取り込みました")
+        self.load_accounts()
+    
+    def export_csv(self):
+        """Write all accounts to a CSV file in the accounts.csv format."""
+        filename = filedialog.asksaveasfilename(title="CSV書出", parent=self.root, defaultextension=".csv",
+                                                initialfile=os.path.basename(self.csv_file),
+                                                filetypes=(('CSV Files', '*.csv'), ('All Files', '*.*')))
+        if not filename:
+            return
+        count = self.store.export_csv(filename)
+        print(f"  {count} 件のアカウントを '{filename}' に保存しました")
+    
+    def add_account(self):
+        """Add a new account."""
+        dialog = AccountDialog(self.root, title="新しいアカウントを追加")
+        self.root.wait_window(dialog)
+        
+        if dialog.result:
+            username = dialog.result['username']
+            if username in self.accounts:
+                messagebox.showwarning("重複", f"アカウント {username} は既に存在します。")
+                return
+            # Add status field
+            dialog.result['status'] = ''
+            self.store_password(dialog.result)
+            self.store.upsert(dialog.result)
+            self.accounts[username] = dialog.result
+            self.account_index[username] = len(self.account_index)
+            self.filter_index.add(username, dialog.result)
+            self.update_media_choices()
+            self.tree.insert("", tk.END, iid=username, values=self.row_values(dialog.result))
+            self.tree.see(username)
+            print(f"  新しいアカウントを追加しました: {username}")
+    
+    def edit_account(self):
+        """Edit selected account."""
+        # Get selected item from tree (only one should be selected for edit)
+        selection = self.tree.selection()
+        
+        if not selection:
+            messagebox.showwarning("未選択", "編集するアカウントを選択してください。")
+            return
+        
+        if len(selection) > 1:
+            messagebox.showwarning("複数選択", "編集するアカウントを1つだけ選択してください。")
+            return
+        
+        old_username = selection[0]
+        account_data = self.accounts[old_username]
+        dialog_data = account_data
+        if self.vault.unlocked and not account_data.get('password'):
+            dialog_data = {**account_data, 'password': self.vault.get(old_username, '')}
+        
+        dialog = AccountDialog(self.root, title="アカウント編集", account_data=dialog_data)
+        self.root.wait_window(dialog)
+        
+        if dialog.result:
+            username = dialog.result['username']
+            if username != old_username and username in self.accounts:
+                messagebox.showwarning("重複", f"アカウント {username} は既に存在します。")
+                return
+            # Preserve the status from the original account
+            dialog.result['status'] = account_data.get('status', '')
+            self.store_password(dialog.result, old_username)
+            self.store.update(old_username, dialog.result)
+            self.filter_index.remove(old_username, account_data)
+            self.filter_index.add(username, dialog.result)
+            self.update_media_choices()
+            
+            checked = old_username in self.selected_items
+            if username == old_username:
+                self.accounts[username] = dialog.result
+                self.tree.item(username, values=self.row_values(dialog.result))
+            else:
+                # Item ids are usernames: replace the item at the same position
+                self.client_pool.discard(old_username)
+                renamed = {}
+                for name, row in self.accounts.items():
+                    if name == old_username:
+                        name, row = username, dialog.result
+                    renamed[name] = row
+                self.accounts = renamed
+                self.account_index[username] = self.account_index.pop(old_username)
+                index = self.tree.index(old_username)
+                self.tree.delete(old_username)
+                self.selected_items.discard(old_username)
+                self.tree.insert("", index, iid=username, values=self.row_values(dialog.result))
+                self.tree.selection_set(username)
+            if checked:
+                self.selected_items.add(username)
+                self.tree.set(username, "選択", "☑")
+            print(f"  アカウントを更新しました: {username}")
+    
+    def delete_account(self):
+        """Delete selected account(s) based on checkboxes."""
+        # Use checkbox selection instead of tree selection
+        if not self.selected_items:
+            messagebox.showwarning("未選択", "削除したいアカウントのチェックボックスを選択してください。")
+            return
+        
+        # Confirm deletion, naming checked accounts the filter hides
+        hidden = len(self.selected_items - self.matching_accounts())
+        note = f"\n（うち {hidden} 件は絞り込みで非表示です）" if hidden else ""
+        if not messagebox.askyesno("削除確認",
+                                   f"{len(self.selected_items)} 件のアカウントを削除してもよろしいですか？{note}"):
+            return
+        
+        deleted_usernames = [username for username in self.accounts if username in self.selected_items]
+        self.store.delete(deleted_usernames)
+        if self.vault.unlocked:
+            self.vault.delete(deleted_usernames)
+        for username in deleted_usernames:
+            self.client_pool.discard(username)
+            self.filter_index.remove(username, self.accounts.pop(username))
+        self.tree.delete(*(username for username in deleted_usernames if self.tree.exists(username)))
+        self.reindex_accounts()
+        self.update_media_choices()
+        
+        # Clear checkbox selection
+        self.selected_items.clear()
+        self.update_filter_count()
+        
+        print(f"  {len(deleted_usernames)} 件のアカウントを削除しました: {', '.join(deleted_usernames)}")
+    
+    def on_tree_click(self, event):
+        """Handle click on tree item."""
+        region = self.tree.identify_region(event.x, event.y)
+        if region == "cell":
+            column = self.tree.identify_column(event.x)
+            if column == "#1":  # Select column
+                item = self.tree.identify_row(event.y)
+                if item:
+                    if item in self.selected_items:
+                        self.selected_items.remove(item)
+                        self.tree.set(item, "選択", "☐")
+                    else:
+                        self.selected_items.add(item)
+                        self.tree.set(item, "選択", "☑")
+    
+    def select_all(self):
+        """Select every account shown in the table; rows hidden by the filter are left unchecked."""
+        self.selected_items = set(self.matching_accounts())
+        self.in_chunks(self.tree.get_children(), self.show_checked)
+        self.update_filter_count()
+        print(f"  表示中の {len(self.selected_items)} 件のアカウントを選択しました")
+    
+    def deselect_all(self):
+        """Deselect all accounts."""
+        checked = [username for username in self.selected_items if self.tree.exists(username)]
+        self.selected_items = set()
+        self.in_chunks(checked, self.show_checked)
+        self.update_filter_count()
+        print("  すべてのアカウントの選択を解除しました")
+    
+    def post_stories(self):
+        """Post stories to selected accounts."""
+        if not self.selected_items:
+            print(" アカウントが選択されていません！最低1件を選択してください。")
+            return
+        
+        hidden = len(self.selected_items - self.matching_accounts())
+        if hidden:
+            print(f"  選択中のうち {hidden} 件は絞り込みで非表示ですが、投稿対象に含まれます")
+        
+        # Row indices in the store's order
+        selected_indices = sorted(self.account_index[username] for username in self.selected_items)
+        
+        self.start_posting(process_selected_accounts, selected_indices, self.store.filename)
+    
+    def resume_posting(self):
+        """Resume the last interrupted batch from its journal."""
+        journal_file = latest_unfinished_journal()
+        if not journal_file:
+            messagebox.showinfo("再開", "中断されたバッチはありません。")
+            return
+        if not messagebox.askyesno("再開", f"中断されたバッチを再開しますか？\n{journal_file}"):
+            return
+        
+        self.start_posting(resume_batch, journal_file)
+    
+    def retry_failed_posts(self):
+        """Re-post only the failed stories of the last batch, chosen from its status report."""
+        report_file = latest_status_report()
+        if not report_file:
+            messagebox.showinfo("再試行", "ステータスレポートがありません。")
+            return
+        if not messagebox.askyesno("再試行", f"失敗したストーリーだけを再投稿しますか？\n{report_file}"):
+            return
+        
+        self.start_posting(retry_failed, report_file)
+    
+    def open_schedules(self):
+        """Show the schedule dialog; checked accounts can be scheduled as a batch."""
+        checked = [username for username in self.accounts if username in self.selected_items]
+        dialog = ScheduleDialog(self.root, self.scheduler, self.store.filename, checked)
+        self.root.wait_window(dialog)
+    
+    def run_scheduled_batch(self, selected_rows, source, **kwargs):
+        """Called from a scheduler batch thread when a schedule comes due."""
+        try:
+            return process_selected_accounts(selected_rows, source, client_pool=self.client_pool,
+                                             proxies=self.proxies, **kwargs)
+        finally:
+            self.root.after(0, self.refresh_statuses)
+    
+    def refresh_statuses(self):
+        """Pick up statuses a scheduled batch saved to the store, without rebuilding the table."""
+        for row in self.store.all():
+            username = row['username']
+            account = self.accounts.get(username)
+            if account is None or account.get('status', '') == row['status']:
+                continue
+            self.filter_index.remove(username, account)
+            account['status'] = row['status']
+            self.filter_index.add(username, account)
+            if self.tree.exists(username):
+                self.tree.set(username, "ステータス", row['status'])
+    
+    def watch_scheduled_batches(self):
+        self.update_resume_button()
+        self.root.after(SCHEDULE_CHECK_MS, self.watch_scheduled_batches)
+    
+    def update_resume_button(self):
+        """Disable 中断から再開 while a batch runs; a scheduled batch's journal is not interrupted."""
+        busy = self.posting or self.scheduler.busy()
+        self.resume_btn.configure(state='disabled' if busy else 'normal')
+    
+    def start_posting(self, target, *args):
+        """Disable the buttons and run a posting function in a background thread."""
+        # Disable buttons during posting
+        self.posting = True
+        self.set_buttons_state('disabled')
+        
+        # Run in separate thread to avoid freezing GUI
+        thread = threading.Thread(target=self.post_thread, args=(target, *args))
+        thread.daemon = True
+        thread.start()
+    
+    def post_thread(self, target, *args):
+        """Thread function for posting stories."""
+        try:
+            status_file = target(*args, client_pool=self.client_pool, proxies=self.proxies)
+            # if status_file:
+                # print(f"\n Status report saved to: {status_file}")
+        except Exception as e:
+            print(f" Error during posting: {e}")
+        finally:
+            # Re-enable buttons
+            self.root.after(0, self.enable_buttons)
+            self.root.after(0, self.load_accounts)
+    
+    def set_buttons_state(self, state):
+        for button in (self.post_btn, self.resume_btn, self.retry_btn, self.refresh_btn, self.select_all_btn,
+                       self.deselect_all_btn, self.add_btn, self.edit_btn, self.delete_btn, self.import_btn,
+                       self.export_btn, self.select_matching_btn, self.clear_filter_btn):
+            button.configure(state=state)
+    
+    def enable_buttons(self):
+        """Re-enable buttons after posting."""
+        self.posting = False
+        self.set_buttons_state('normal')
+        self.update_resume_button()
@@ -0,0 +1,82 @@
+import csv
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark
+import story_uploader
+
+
+class FakeClient(benchmark.FakeClient):
+    """benchmark.FakeClient without latency or injected failures, recording every story it posts.
+
+    ``fail_unlinked`` makes every story without a link fail with a permanent error.
+    """
+    time_scale = 0
+    failure_rate = 0.0
+    posted = []  # (username, story kind) of every successful upload
+    fail_unlinked = False
+
+    @property
+    def username(self):
+        # benchmark.FakeClient's session id is "fake-<username>", also after a session restore
+        return (self.sessionid or "")[len("fake-"):]
+
+    def _record(self, links):
+        kind = "link" if links else "no_link"
+        if kind == "no_link" and self.fail_unlinked:
+            raise ValueError("media rejected")
+        self.posted.append((self.username, kind))
+
+    def photo_upload_to_story(self, path, caption="", links=(), **kwargs):
+        super().photo_upload_to_story(path, caption, links, **kwargs)
+        self._record(links)
+
+    def video_upload_to_story(self, path, caption="", thumbnail=None, links=(), **kwargs):
+        super().video_upload_to_story(path, caption, thumbnail, links, **kwargs)
+        self._record(links)
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    FakeClient.posted = []
+    FakeClient.fail_unlinked = False
+    monkeypatch.setattr(story_uploader, "Client", FakeClient)
+    return FakeClient
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def make_image(path, size=(64, 64)):
+    from PIL import Image
+    Image.new("RGB", size, (200, 80, 40)).save(path, "JPEG")
+    return str(path)
+
+
+def write_accounts_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=story_uploader.ACCOUNT_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({field: row.get(field, '') for field in story_uploader.ACCOUNT_FIELDS})
+    return str(path)
+
+
+@pytest.fixture
+def batch_kwargs(workdir):
+    """Arguments that keep a batch offline, unthrottled and inside the test directory."""
+    unlimited = {scope: (1000, 1000) for scope in story_uploader.RATE_LIMITS}
+    return {
+        'limiter': story_uploader.RateLimiter(unlimited),
+        'media': story_uploader.MediaCache(str(workdir / "media_cache")),
+        'sessions': story_uploader.SessionStore(str(workdir / "sessions")),
+        'proxies': story_uploader.ProxyManager(),
+        'vault': story_uploader.CredentialVault(str(workdir / "credentials.vault")),
+    }
@@ -0,0 +1,44 @@
+import story_uploader
+from conftest import write_accounts_csv
+
+
+def make_store(workdir):
+    return story_uploader.AccountStore(str(workdir / "accounts.db"))
+
+
+def test_update_renames_in_place(workdir):
+    with make_store(workdir) as store:
+        store.upsert_many([{'username': name, 'password': "pw"} for name in ("a", "b", "c")])
+        store.update("b", {'username': "bee", 'password': "new", 'link_url': "https://example.com/"})
+        assert [row['username'] for row in store.all()] == ["a", "bee", "c"]
+        assert "b" not in store
+        assert store.get("bee")['password'] == "new"
+        assert store.get("bee")['link_url'] == "https://example.com/"
+
+
+def test_delete_and_status(workdir):
+    with make_store(workdir) as store:
+        store.upsert_many([{'username': name} for name in ("a", "b", "c")])
+        store.set_status("c", "成功")
+        store.delete(["a", "b", "missing"])
+        assert [(row['username'], row['status']) for row in store.all()] == [("c", "成功")]
+        assert len(store) == 1
+
+
+def test_upsert_keeps_position_and_csv_round_trip(workdir):
+    source = write_accounts_csv(workdir / "in.csv", [{'username': "a", 'post_caption': "one"},
+                                                     {'username': "b", 'post_caption': "two"}])
+    with make_store(workdir) as store:
+        assert store.import_csv(source) == 2
+        store.upsert({'username': "a", 'post_caption': "changed"})
+        assert store.export_csv(str(workdir / "out.csv")) == 2
+    _, rows = story_uploader.read_accounts_csv(str(workdir / "out.csv"))
+    assert [(row['username'], row['post_caption']) for row in rows] == [("a", "changed"), ("b", "two")]
+
+
+def test_meta_survives_reopening(workdir):
+    with make_store(workdir) as store:
+        assert store.get_meta('csv_migrated') is None
+        store.set_meta('csv_migrated', "accounts.csv")
+    with make_store(workdir) as store:
+        assert store.get_meta('csv_migrated') == "accounts.csv"
@@ -0,0 +1,38 @@
+import pytest
+import requests
+from instagrapi.exceptions import (
+    ChallengeRequired,
+    ClientConnectionError,
+    ClientThrottledError,
+    LoginRequired,
+    PleaseWaitFewMinutes,
+)
+
+from story_uploader import classify_error
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError("request failed", response=response)
+
+
+@pytest.mark.parametrize("error, expected", [
+    (ChallengeRequired("challenge_required"), "permanent"),
+    (LoginRequired("login_required"), "auth"),
+    (ClientThrottledError("throttled"), "rate_limit"),
+    (PleaseWaitFewMinutes("Please wait a few minutes"), "rate_limit"),
+    (ClientConnectionError("reset"), "transient"),
+    (requests.ConnectionError("reset"), "transient"),
+    (TimeoutError(), "transient"),
+    (http_error(429), "rate_limit"),
+    (http_error(503), "transient"),
+    (requests.HTTPError("500 Server Error: Internal Server Error for url"), "transient"),
+    (Exception("HTTP 403 Forbidden"), "auth"),
+    (Exception("429 Too Many Requests"), "rate_limit"),
+    (Exception("read timed out"), "transient"),
+    (ValueError("media rejected"), "permanent"),
+    (ValueError("image is 1500 px wide"), "permanent"),
+])
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import story_uploader
+
+
+class UploadSink(BaseHTTPRequestHandler):
+    """Reads the whole request body and answers with its length and SHA-256."""
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        reply = f"{len(body)} {hashlib.sha256(body).hexdigest()}".encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def do_GET(self):
+        time.sleep(2)
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), UploadSink)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def session_with(adapter):
+    session = requests.Session()
+    session.mount("http://", adapter)
+    return session
+
+
+def test_large_upload_reports_progress_and_arrives_whole(server):
+    steps = []
+    adapter = story_uploader.TunedHTTPAdapter(progress=lambda sent, total: steps.append((sent, total)))
+    body = os.urandom(3 * 1024 * 1024 // 2)
+
+    response = session_with(adapter).post(f"{server}/upload", data=body)
+    assert response.text == f"{len(body)} {hashlib.sha256(body).hexdigest()}"
+    assert steps[-1] == (len(body), len(body))
+    assert all(total == len(body) for _, total in steps)
+    sent = [0] + [sent for sent, _ in steps]
+    assert all(later - earlier >= len(body) * story_uploader.UPLOAD_PROGRESS_STEP // 100
+               for earlier, later in zip(sent, sent[1:]))
+
+
+def test_small_upload_is_not_wrapped(server):
+    steps = []
+    adapter = story_uploader.TunedHTTPAdapter(progress=lambda sent, total: steps.append(sent))
+    response = session_with(adapter).post(f"{server}/upload", data=b"x" * 1000)
+    assert response.text.startswith("1000 ")
+    assert steps == []
+
+
+def test_default_timeout_applies(server):
+    adapter = story_uploader.TunedHTTPAdapter(timeout=(1, 0.2))
+    with pytest.raises(requests.ReadTimeout):
+        session_with(adapter).get(f"{server}/slow")
+
+
+def test_progress_body_rewinds():
+    steps = []
+    body = story_uploader.ProgressBody(b"x" * 100, lambda sent, total: steps.append(sent))
+    assert body.read(50) == b"x" * 50 and body.tell() == 50
+    assert body.seek(0) == 0
+    assert len(body.read()) == 100
+    assert body.seek(-10, os.SEEK_END) == 90 and body.read(100) == b"x" * 10
+    assert steps == [50, 100, 100]
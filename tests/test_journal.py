@@ -0,0 +1,50 @@
+import json
+
+import story_uploader
+from conftest import make_image, write_accounts_csv
+from story_uploader import STORY_NO_LINK, STORY_WITH_LINK, BatchJournal
+
+
+def test_load_keeps_uploads_and_skips_a_torn_line(workdir):
+    journal = BatchJournal(str(workdir / "batch.jsonl"))
+    journal._append({'event': 'batch', 'csv_file': "accounts.csv", 'usernames': ["alice"]})
+    journal.record("alice", STORY_WITH_LINK, "queued")
+    journal.record("alice", STORY_WITH_LINK, "uploaded")
+    journal.record("alice", STORY_WITH_LINK, "failed")  # an upload can never be undone
+    journal.record("alice", STORY_NO_LINK, "queued")
+    journal.record("alice", STORY_NO_LINK, "failed")
+    journal.finish()
+    journal.mark_resumed("status_report_2.csv")
+    journal.close()
+    with open(journal.filename, 'a', encoding='utf-8') as file:
+        file.write(json.dumps({'event': 'finished'})[:8])
+
+    header, states, finished = BatchJournal.load(journal.filename)
+    assert header['usernames'] == ["alice"]
+    assert states == {("alice", STORY_WITH_LINK): "uploaded", ("alice", STORY_NO_LINK): "failed"}
+    assert not finished
+
+
+def test_resume_posts_only_what_the_journal_lacks(workdir, fake_client, batch_kwargs):
+    link, plain = make_image(workdir / "link.jpg"), make_image(workdir / "plain.jpg")
+    rows = [
+        {'username': "alice", 'password': "a", 'post_file': link, 'post_file_no_link': plain,
+         'link_url': "https://example.com/"},
+        {'username': "bob", 'password': "b", 'post_file_no_link': plain},
+        {'username': "carol", 'password': "c", 'post_file': link, 'link_url': "https://example.com/"},
+    ]
+    csv_file = write_accounts_csv(workdir / "accounts.csv", rows)
+    _, loaded = story_uploader.load_account_rows(csv_file)
+
+    # The batch was interrupted after alice's linked story and bob's only story went out
+    journal = BatchJournal.create(csv_file, loaded, [0, 1, 2], "status_report.csv")
+    journal.record("alice", STORY_WITH_LINK, "uploaded")
+    journal.record("bob", STORY_NO_LINK, "uploaded")
+    journal.close()
+    assert story_uploader.latest_unfinished_journal() == journal.filename
+
+    assert story_uploader.resume_batch(**batch_kwargs)
+    assert sorted(fake_client.posted) == [("alice", "no_link"), ("carol", "link")]
+    assert story_uploader.latest_unfinished_journal() is None
+    assert story_uploader.resume_batch(journal.filename, **batch_kwargs) is None
+    assert len(fake_client.posted) == 2
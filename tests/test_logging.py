@@ -0,0 +1,31 @@
+import logging
+
+import pytest
+
+import story_uploader
+
+
+@pytest.fixture
+def log_level():
+    """Set the uploader logger's level for one test."""
+    previous = story_uploader.logger.level
+    yield story_uploader.logger.setLevel
+    story_uploader.logger.setLevel(previous)
+
+
+class Unformattable:
+    def __str__(self):
+        raise AssertionError("formatted although the level is disabled")
+
+
+def test_disabled_levels_are_not_formatted(log_level):
+    log_level(logging.INFO)
+    story_uploader.debug_log("value %s", "DEBUG", Unformattable())
+    story_uploader.debug_log("value %s", "デバッグ", Unformattable())
+
+
+def test_lazy_arguments_are_formatted_when_enabled(log_level, caplog):
+    log_level(logging.DEBUG)
+    with caplog.at_level(logging.DEBUG, logger=story_uploader.logger.name):
+        story_uploader.debug_log("  Uploaded %d%% (%d / %d KiB)", "DEBUG", 50, 1, 2)
+    assert "Uploaded 50% (1 / 2 KiB)" in caplog.text
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+import main
+import story_uploader
+from conftest import write_accounts_csv
+
+
+def test_parse_rows():
+    assert main.parse_rows("1,3-5, 3") == [0, 2, 3, 4]
+
+
+def test_rows_beyond_the_file_are_a_usage_error(workdir, capsys):
+    csv_file = write_accounts_csv(workdir / "accounts.csv", [{'username': "alice", 'password': "pw"}])
+    with pytest.raises(SystemExit) as exit_info:
+        main.main(["post", "--csv", csv_file, "--rows", "5"])
+    assert exit_info.value.code == 2
+    assert "has only 1 rows" in capsys.readouterr().err
+    # Nothing was started that resume or retry could pick up
+    assert not os.path.exists(story_uploader.JOURNAL_FOLDER)
+    assert not os.path.exists(story_uploader.STATUS_FOLDER)
+
+
+@pytest.mark.parametrize("selection", [["--all"], ["--rows", "1"]])
+def test_missing_accounts_file_is_a_usage_error(workdir, capsys, selection):
+    with pytest.raises(SystemExit) as exit_info:
+        main.main(["post", "--csv", "missing.csv", *selection])
+    assert exit_info.value.code == 2
+    assert "accounts file not found: missing.csv" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("at", ["9am", "25:00", "2026-13-01 09:00"])
+def test_bad_schedule_time_is_a_usage_error(workdir, capsys, at):
+    csv_file = write_accounts_csv(workdir / "accounts.csv", [{'username': "alice", 'password': "pw"}])
+    with pytest.raises(SystemExit) as exit_info:
+        main.main(["schedule", "add", "--at", at, "--csv", csv_file, "--all"])
+    assert exit_info.value.code == 2
+    assert "argument --at" in capsys.readouterr().err
+    assert not os.path.exists(story_uploader.SCHEDULE_DB_FILE)
@@ -0,0 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import story_uploader
+
+
+def failing_transcode(calls):
+    def transcode(src, dst, thumbnail, params):
+        calls.append(src)
+        raise RuntimeError("encoder crashed")
+    return transcode
+
+
+def test_failed_transcode_is_not_repeated(workdir, monkeypatch):
+    calls = []
+    monkeypatch.setattr(story_uploader, "transcode_video_to_cache", failing_transcode(calls))
+    video = workdir / "clip.mp4"
+    video.write_bytes(b"not really a video")
+    cache = story_uploader.MediaCache(str(workdir / "media_cache"))
+
+    for _ in range(3):
+        prepared = cache.prepare(video, "video/mp4")
+        assert prepared.path == video and prepared.thumbnail is None
+    assert len(calls) == 1
+
+
+def test_failed_background_transcode_is_not_started_again(workdir, monkeypatch):
+    calls = []
+    monkeypatch.setattr(story_uploader, "transcode_video_to_cache", failing_transcode(calls))
+    video = workdir / "clip.mp4"
+    video.write_bytes(b"not really a video")
+    cache = story_uploader.MediaCache(str(workdir / "media_cache"))
+
+    with ThreadPoolExecutor(1) as executor:
+        assert cache.prefetch_videos([video], executor) == 1
+        assert cache.prepare(video, "video/mp4").path == video
+        assert cache.prefetch_videos([video], executor) == 0
+    assert cache.prepare(video, "video/mp4").path == video
+    assert len(calls) == 1
@@ -0,0 +1,9 @@
+import story_uploader
+
+
+def test_nearest_rank_percentile():
+    assert story_uploader.percentile([], 50) == 0.0
+    assert story_uploader.percentile([2, 1], 50) == 1
+    assert story_uploader.percentile(list(range(1, 21)), 95) == 19
+    assert story_uploader.percentile(list(range(1, 21)), 100) == 20
+    assert story_uploader.percentile([5], 0) == 5
@@ -0,0 +1,104 @@
+import socket
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import story_uploader
+
+
+class StandInProxy(BaseHTTPRequestHandler):
+    """Answers every request, including absolute-URI proxy requests, with 200."""
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadingServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def live_proxy():
+    server = ThreadingServer(('127.0.0.1', 0), StandInProxy)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def dead_proxy():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def make_manager(proxies, **kwargs):
+    return story_uploader.ProxyManager(proxies, check_url="http://example.invalid/", check_timeout=2, **kwargs)
+
+
+def test_no_proxies_goes_direct():
+    assert make_manager([]).assign("alice") is None
+
+
+def alias(proxy):
+    """The same stand-in proxy under a second DSN."""
+    return proxy.replace("127.0.0.1", "localhost")
+
+
+def test_sticky_least_loaded_assignment(live_proxy):
+    second = alias(live_proxy)
+    manager = make_manager([live_proxy, second])
+    first_alice = manager.assign("alice")
+    bob = manager.assign("bob")
+    assert {first_alice, bob} == {live_proxy, second}
+    assert manager.assign("alice") == first_alice
+
+
+def test_own_proxy_wins(live_proxy, dead_proxy):
+    manager = make_manager([dead_proxy])
+    assert manager.assign("alice", own_proxy=live_proxy) == live_proxy
+
+
+def test_unhealthy_proxy_is_skipped(live_proxy, dead_proxy):
+    manager = make_manager([dead_proxy, live_proxy])
+    assert manager.assign("alice") == live_proxy
+    assert manager.assign("bob") == live_proxy
+
+
+def test_failover_after_repeated_connection_errors(live_proxy):
+    second = alias(live_proxy)
+    manager = make_manager([live_proxy, second], max_failures=2)
+    first = manager.assign("alice")
+    assert not manager.report_failure(first)
+    assert manager.report_failure(first)
+    assert manager.assign("alice") != first
+    
+    manager.report_failure(manager.assign("alice"))
+    assert manager.report_failure(manager.assign("alice"))
+    with pytest.raises(story_uploader.ProxyUnavailable):
+        manager.assign("alice")
+
+
+def test_failure_count_resets_on_success(live_proxy):
+    manager = make_manager([live_proxy], max_failures=2)
+    manager.assign("alice")
+    manager.report_failure(live_proxy)
+    manager.report_success(live_proxy)
+    assert not manager.report_failure(live_proxy)
+
+
+def test_client_going_direct_forgets_its_proxy(live_proxy):
+    cl = story_uploader.Client()
+    story_uploader.set_client_proxy(cl, live_proxy)
+    assert cl.proxy == live_proxy
+    story_uploader.set_client_proxy(cl, None)
+    assert cl.proxy is None
+    assert cl.private.proxies == cl.public.proxies == {}
@@ -0,0 +1,28 @@
+import time
+
+import story_uploader
+
+
+def test_worker_bursts_follow_the_batch():
+    limiter = story_uploader.RateLimiter({"account": (1, 3), "proxy": (1, None), "global": (1, None)}, workers=2)
+    assert limiter._bucket("global", None).capacity == 2 * story_uploader.ACCOUNT_REQUESTS
+    limiter.set_workers(8)
+    assert limiter._bucket("global", None).capacity == 8 * story_uploader.ACCOUNT_REQUESTS
+    assert limiter._bucket("proxy", "direct").capacity == 8 * story_uploader.ACCOUNT_REQUESTS
+    assert limiter._bucket("account", "a").capacity == 3
+
+
+def test_burst_is_free_then_paced():
+    limiter = story_uploader.RateLimiter({"account": (1000, 2), "proxy": (1000, 10), "global": (1000, 10)})
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") > 0
+
+
+def test_throughput_scales_with_proxies():
+    # No process-wide cap by default: each egress IP only spends its own budget
+    assert story_uploader.RATE_LIMITS["global"][0] is None
+    limiter = story_uploader.RateLimiter({"account": (1000, 1), "proxy": (1 / 60, 1), "global": (None, None)})
+    assert limiter.accounts_per_minute("global") == float("inf")
+    assert all(limiter.acquire(f"user{n}", proxy=f"proxy{n}") == 0 for n in range(20))
+    assert limiter._bucket("proxy", "proxy0").delay(time.monotonic()) > 0
@@ -0,0 +1,50 @@
+from collections import Counter
+
+import story_uploader
+from conftest import make_image, write_accounts_csv
+
+
+def test_retry_of_a_retry_posts_each_story_once(workdir, fake_client, batch_kwargs):
+    csv_file = write_accounts_csv(workdir / "accounts.csv", [{
+        'username': "alice",
+        'password': "secret",
+        'post_file': make_image(workdir / "link.jpg"),
+        'post_file_no_link': make_image(workdir / "plain.jpg"),
+        'link_url': "https://example.com/",
+    }])
+    fake_client.fail_unlinked = True
+    
+    report = story_uploader.process_selected_accounts([0], csv_file, **batch_kwargs)
+    assert fake_client.posted == [("alice", "link")]
+    
+    # The no-link story keeps failing: nothing may be posted again
+    report = story_uploader.retry_failed(report, **batch_kwargs)
+    report = story_uploader.retry_failed(report, **batch_kwargs)
+    assert fake_client.posted == [("alice", "link")]
+    
+    fake_client.fail_unlinked = False
+    report = story_uploader.retry_failed(report, **batch_kwargs)
+    assert story_uploader.retry_failed(report, **batch_kwargs) is None
+    assert Counter(fake_client.posted) == {("alice", "link"): 1, ("alice", "no_link"): 1}
+
+
+def test_retry_of_a_resumed_batch_finds_its_journal(workdir, fake_client, batch_kwargs):
+    csv_file = write_accounts_csv(workdir / "accounts.csv", [{
+        'username': "alice",
+        'password': "secret",
+        'post_file': make_image(workdir / "link.jpg"),
+        'post_file_no_link': make_image(workdir / "plain.jpg"),
+        'link_url': "https://example.com/",
+    }])
+    _, rows = story_uploader.load_account_rows(csv_file)
+    # A batch that was interrupted before anything went out
+    story_uploader.BatchJournal.create(csv_file, rows, [0], "status_report_first.csv").close()
+    fake_client.fail_unlinked = True
+    
+    report = story_uploader.resume_batch(**batch_kwargs)
+    assert fake_client.posted == [("alice", "link")]
+    assert story_uploader.find_batch_journal(report)
+    
+    fake_client.fail_unlinked = False
+    assert story_uploader.retry_failed(report, **batch_kwargs)
+    assert Counter(fake_client.posted) == {("alice", "link"): 1, ("alice", "no_link"): 1}
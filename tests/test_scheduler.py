@@ -0,0 +1,127 @@
+import time
+
+import story_uploader
+from conftest import write_accounts_csv
+
+
+def make_scheduler(workdir, calls):
+    def run_batch(selected_rows, source, start_times=None, start_check=None):
+        calls.append((selected_rows, source, start_times))
+        return "report.csv"
+    return story_uploader.PostScheduler(str(workdir / "schedule.db"), run_batch=run_batch)
+
+
+def test_one_batch_per_occurrence_spread_over_window(workdir):
+    source = write_accounts_csv(workdir / "accounts.csv", [{'username': f"user{n}"} for n in range(5)])
+    calls = []
+    scheduler = make_scheduler(workdir, calls)
+    now = time.time()
+    scheduler.add(source, now - 1, "daily", window_minutes=10)
+    
+    assert scheduler.run_pending(now, wait=True) == 1
+    (selected_rows, batch_source, start_times), = calls
+    assert batch_source == source and sorted(selected_rows) == [0, 1, 2, 3, 4]
+    starts = [start_times[i] for i in selected_rows]
+    assert starts == sorted(starts)
+    assert now <= starts[0] and starts[-1] <= now + 10 * 60
+    assert not scheduler.pending_jobs()
+    
+    # Nothing else is due until tomorrow
+    assert scheduler.run_pending(now + 60, wait=True) == 0
+    assert scheduler.schedules()[0]['next_run'] > now + 23 * 60 * 60
+    scheduler.close()
+
+
+def test_only_the_run_loop_owner_recovers_running_jobs(workdir):
+    source = write_accounts_csv(workdir / "accounts.csv", [{'username': "user0"}])
+    scheduler = make_scheduler(workdir, [])
+    scheduler.add(source, time.time() + 3600)
+    scheduler._queue_due_schedules(time.time() + 3600)
+    with scheduler.conn:
+        scheduler.conn.execute("UPDATE jobs SET state = 'running'")
+    
+    # Another process listing schedules must not touch the running job
+    story_uploader.PostScheduler(str(workdir / "schedule.db")).close()
+    assert scheduler.conn.execute("SELECT state FROM jobs").fetchone()[0] == "running"
+    
+    assert scheduler.recover_interrupted() == 1
+    assert scheduler.conn.execute("SELECT state FROM jobs").fetchone()[0] == "interrupted"
+    scheduler.close()
+
+
+def test_scheduled_batch_posts_every_account_in_one_report(workdir, fake_client, batch_kwargs):
+    from conftest import make_image
+    image = make_image(workdir / "story.jpg")
+    source = write_accounts_csv(workdir / "accounts.csv", [
+        {'username': f"user{n}", 'password': "pw", 'post_file_no_link': image} for n in range(3)])
+    scheduler = story_uploader.PostScheduler(
+        str(workdir / "schedule.db"),
+        run_batch=lambda rows, source, **kwargs: story_uploader.process_selected_accounts(
+            rows, source, **batch_kwargs, **kwargs))
+    scheduler.add(source, time.time() - 1, window_minutes=0.01)
+    
+    assert scheduler.run_pending(wait=True) == 1
+    assert sorted(fake_client.posted) == [(f"user{n}", "no_link") for n in range(3)]
+    assert len(list((workdir / story_uploader.STATUS_FOLDER).glob("status_report_*.csv"))) == 1
+    scheduler.close()
+
+
+def test_running_scheduled_batch_is_not_offered_for_resume(workdir, fake_client, batch_kwargs):
+    from conftest import make_image
+    image = make_image(workdir / "story.jpg")
+    source = write_accounts_csv(workdir / "accounts.csv", [
+        {'username': f"user{n}", 'password': "pw", 'post_file_no_link': image} for n in range(3)])
+    scheduler = story_uploader.PostScheduler(
+        str(workdir / "schedule.db"),
+        run_batch=lambda rows, source, **kwargs: story_uploader.process_selected_accounts(
+            rows, source, **batch_kwargs, **kwargs))
+    scheduler.add(source, time.time() - 1, window_minutes=0.02)
+    
+    assert scheduler.run_pending() == 1
+    journals = workdir / story_uploader.JOURNAL_FOLDER
+    deadline = time.time() + 5
+    while not list(journals.glob("*.jsonl")) and time.time() < deadline:
+        time.sleep(0.01)
+    journal_file, = journals.glob("*.jsonl")
+    
+    # The accounts wait for their start times, so the journal is unfinished but live
+    assert scheduler.busy()
+    assert story_uploader.latest_unfinished_journal() is None
+    assert story_uploader.resume_batch(str(journal_file), **batch_kwargs) is None
+    
+    for thread in scheduler.batch_threads:
+        thread.join()
+    assert not scheduler.busy()
+    assert sorted(fake_client.posted) == [(f"user{n}", "no_link") for n in range(3)]
+    assert not story_uploader.BatchJournal.in_use(str(journal_file))
+    scheduler.close()
+
+
+def test_removing_a_schedule_cancels_accounts_that_have_not_started(workdir, fake_client, batch_kwargs,
+                                                                     monkeypatch):
+    monkeypatch.setattr(story_uploader.random, "uniform", lambda low, high: low)  # start times 0 s, 1 s, 2 s
+    from conftest import make_image
+    image = make_image(workdir / "story.jpg")
+    source = write_accounts_csv(workdir / "accounts.csv", [
+        {'username': f"user{n}", 'password': "pw", 'post_file_no_link': image} for n in range(3)])
+    scheduler = story_uploader.PostScheduler(
+        str(workdir / "schedule.db"),
+        run_batch=lambda rows, source, **kwargs: story_uploader.process_selected_accounts(
+            rows, source, **batch_kwargs, **kwargs))
+    schedule_id = scheduler.add(source, time.time() - 1, window_minutes=0.05)
+    
+    assert scheduler.run_pending() == 1
+    deadline = time.time() + 5
+    while not fake_client.posted and time.time() < deadline:
+        time.sleep(0.01)
+    # The first account is on its way; the other two are still waiting for their start times
+    assert scheduler.remove(schedule_id) == 2
+    for thread in scheduler.batch_threads:
+        thread.join()
+    
+    assert fake_client.posted == [("user0", "no_link")]
+    report, = (workdir / story_uploader.STATUS_FOLDER).glob("status_report_*.csv")
+    assert story_uploader.retry_failed(str(report), **batch_kwargs) is None
+    assert story_uploader.latest_unfinished_journal() is None
+    assert fake_client.posted == [("user0", "no_link")]
+    scheduler.close()
@@ -0,0 +1,69 @@
+import json
+import os
+import threading
+
+import story_uploader
+
+
+def read_session(store, username):
+    with open(store.path(username), encoding='utf-8') as file:
+        return json.load(file)
+
+
+def test_put_is_on_disk_after_flush(workdir):
+    store = story_uploader.SessionStore(str(workdir / "sessions"))
+    store.put("alice", {"authorization_data": {"sessionid": "1"}})
+    assert store.flush(timeout=5)
+    assert read_session(store, "alice") == {"authorization_data": {"sessionid": "1"}}
+    assert not [name for name in os.listdir(store.folder) if name.endswith(".tmp")]
+
+
+def test_delete_after_put_leaves_no_file(workdir):
+    store = story_uploader.SessionStore(str(workdir / "sessions"))
+    store.put("alice", {"sessionid": "1"})
+    assert store.flush(timeout=5)
+    store.put("alice", {"sessionid": "2"})
+    store.delete("alice")
+    assert store.flush(timeout=5)
+    assert not os.path.exists(store.path("alice"))
+    assert store.get("alice") is None
+
+
+def test_only_the_newest_of_queued_puts_is_written(workdir, monkeypatch):
+    store = story_uploader.SessionStore(str(workdir / "sessions"))
+    written, release = [], threading.Event()
+    write = store._write
+
+    def blocking_write(username, settings):
+        if username == "blocker":
+            release.wait(5)  # keeps the writer busy while alice's puts queue up
+        written.append((username, settings))
+        write(username, settings)
+
+    monkeypatch.setattr(store, "_write", blocking_write)
+    store.put("blocker", {})
+    store.put("alice", {"sessionid": "old"})
+    store.put("alice", {"sessionid": "new"})
+    release.set()
+    assert store.flush(timeout=5)
+    assert written == [("blocker", {}), ("alice", {"sessionid": "new"})]
+    assert read_session(store, "alice") == {"sessionid": "new"}
+
+
+def test_get_prefers_the_cache_over_a_stale_file(workdir):
+    store = story_uploader.SessionStore(str(workdir / "sessions"))
+    os.makedirs(store.folder)
+    with open(store.path("alice"), 'w', encoding='utf-8') as file:
+        json.dump({"sessionid": "stale"}, file)
+    assert store.get("alice") == {"sessionid": "stale"}
+
+    store.put("alice", {"sessionid": "fresh"})
+    assert store.get("alice") == {"sessionid": "fresh"}
+    assert store.flush(timeout=5)
+    with open(store.path("alice"), 'w', encoding='utf-8') as file:
+        json.dump({"sessionid": "stale"}, file)
+    assert store.get("alice") == {"sessionid": "fresh"}
+
+    # get() hands out copies, so callers cannot change the cache behind the writer's back
+    store.get("alice")["sessionid"] = "changed"
+    assert store.get("alice") == {"sessionid": "fresh"}
@@ -0,0 +1,96 @@
+import csv
+import json
+
+import pytest
+
+import story_uploader
+from conftest import make_image, write_accounts_csv
+
+
+def unlocked_vault(path, passwords=None):
+    vault = story_uploader.CredentialVault(str(path))
+    vault.unlock("passphrase")
+    if passwords:
+        vault.set_many(passwords)
+    return vault
+
+
+def account(workdir, password=''):
+    return {
+        'username': "alice",
+        'password': password,
+        'post_file': make_image(workdir / "link.jpg"),
+        'link_url': "https://example.com/",
+    }
+
+
+def test_empty_vault_passed_in_is_used(workdir, fake_client, batch_kwargs, monkeypatch):
+    # An empty vault has len() == 0; it must not fall back to the shared vault
+    monkeypatch.setattr(story_uploader, "credential_vault",
+                        unlocked_vault(workdir / "shared.vault", {"alice": "secret"}))
+    batch_kwargs['vault'] = unlocked_vault(workdir / "empty.vault")
+
+    result = story_uploader.process_account(account(workdir), 0, **batch_kwargs)
+    assert result == "Error: Missing credentials"
+    assert fake_client.posted == []
+
+
+def test_password_comes_from_the_vault(workdir, fake_client, batch_kwargs):
+    batch_kwargs['vault'] = unlocked_vault(workdir / "credentials.vault", {"alice": "secret"})
+
+    result = story_uploader.process_account(account(workdir), 0, **batch_kwargs)
+    assert story_uploader.classify_status(result) != "error"
+    assert fake_client.posted == [("alice", "link")]
+
+
+def test_status_report_leaves_out_passwords(workdir, fake_client, batch_kwargs):
+    csv_file = write_accounts_csv(workdir / "accounts.csv", [
+        account(workdir, password="secret"),
+        {'username': "bob", 'password': "hunter2"},
+    ])
+
+    report = story_uploader.process_selected_accounts([0], csv_file, **batch_kwargs)
+    with open(report, encoding='utf-8') as file:
+        content = file.read()
+        file.seek(0)
+        fieldnames = csv.DictReader(file).fieldnames
+    assert 'password' not in fieldnames
+    assert "secret" not in content and "hunter2" not in content
+
+
+def test_round_trip_and_wrong_passphrase(workdir):
+    path = workdir / "credentials.vault"
+    vault = unlocked_vault(path, {"alice": "secret", "bob": "hunter2"})
+    assert vault.set("carol", "pw", old_username="bob")
+    vault.delete(["alice"])
+    # Only the envelope is in the clear; the passwords are in the ciphertext
+    with open(path, encoding='utf-8') as file:
+        assert set(json.load(file)) == {'version', 'kdf', 'nonce', 'tag', 'ciphertext'}
+
+    reopened = story_uploader.CredentialVault(str(path))
+    with pytest.raises(story_uploader.VaultError):
+        reopened.get("carol")
+    with pytest.raises(story_uploader.VaultError):
+        reopened.unlock("wrong passphrase")
+    assert not reopened.unlocked
+
+    reopened.unlock("passphrase")
+    assert reopened.usernames() == ["carol"]
+    assert reopened.get("carol") == "pw"
+
+
+@pytest.mark.parametrize("content", [
+    "",
+    '{"version": 1, "kdf": {"N": 16384, "r": 8, "p": 1, "salt": "AAAA"}',
+    '{"version": 1}',
+    '{"version": 1, "kdf": {"N": 16384, "r": 8, "p": 1, "salt": "AAAA"}, "nonce": "*", "tag": "", "ciphertext": ""}',
+    '[]',
+])
+def test_damaged_file_raises_vault_error(workdir, content):
+    path = workdir / "credentials.vault"
+    path.write_text(content, encoding='utf-8')
+
+    vault = story_uploader.CredentialVault(str(path))
+    with pytest.raises(story_uploader.VaultError):
+        vault.unlock("passphrase")
+    assert not vault.unlocked